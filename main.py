@@ -1,6 +1,8 @@
 import threading
 from tkinter import filedialog, messagebox, PhotoImage
 from moviepy.editor import *
+from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
+from proglog import ProgressBarLogger
 import tkinter as tk
 from tkinter import ttk
 import queue
@@ -12,10 +14,17 @@ from google.auth.transport.requests import Request
 import pickle
 import webbrowser
 import configparser
+import copy
+import time
 
 from tkcalendar import DateEntry
 
 
+# config.ini is rewritten from both the GUI thread (API keys) and the
+# conversion thread (cost model), so every read-modify-write holds this lock.
+config_lock = threading.Lock()
+
+
 def load_api_keys():
     config = configparser.ConfigParser()
     config.read("config.ini")
@@ -24,30 +33,164 @@ def load_api_keys():
     return client_id, client_secret
 
 def save_api_keys(client_id, client_secret):
-    config = configparser.ConfigParser()
-    config.read("config.ini")
-    if not config.has_section("API"):
-        config.add_section("API")
-    config.set("API", "client_id", client_id)
-    config.set("API", "client_secret", client_secret)
-    with open("config.ini", "w") as config_file:
-        config.write(config_file)
+    with config_lock:
+        config = configparser.ConfigParser()
+        config.read("config.ini")
+        if not config.has_section("API"):
+            config.add_section("API")
+        config.set("API", "client_id", client_id)
+        config.set("API", "client_secret", client_secret)
+        with open("config.ini", "w") as config_file:
+            config.write(config_file)
+
+DEFAULT_COST_MODEL = {
+    "ultrafast": {
+        "seconds_per_megapixel_frame": 0.02,
+        "bytes_per_megapixel_second": 270000.0,
+    },
+    "slow": {
+        "seconds_per_megapixel_frame": 0.06,
+        "bytes_per_megapixel_second": 110000.0,
+    },
+}
+AUDIO_BITRATE = "128k"
+AUDIO_BYTES_PER_SECOND = 128000 / 8
+RENDER_OVERHEAD_SECONDS = 2.0
+CALIBRATION_WEIGHT = 0.3
+
+
+def load_cost_model():
+    with config_lock:
+        config = configparser.ConfigParser()
+        config.read("config.ini")
+    model = {}
+    for preset, defaults in DEFAULT_COST_MODEL.items():
+        model[preset] = {
+            key: config.getfloat("Planner", f"{preset}_{key}", fallback=value)
+            for key, value in defaults.items()
+        }
+    return model
+
+def save_cost_model(model):
+    with config_lock:
+        config = configparser.ConfigParser()
+        config.read("config.ini")
+        if not config.has_section("Planner"):
+            config.add_section("Planner")
+        for preset, coefficients in model.items():
+            for key, value in coefficients.items():
+                config.set("Planner", f"{preset}_{key}", repr(value))
+        with open("config.ini", "w") as config_file:
+            config.write(config_file)
+
+def render_settings(settings):
+    return {
+        "width": settings["width"] if settings["custom_resolution"] else 1280,
+        "height": settings["height"] if settings["custom_resolution"] else 720,
+        "fps": 24,
+        "preset": "ultrafast" if not settings["high_quality"] else "slow",
+    }
+
+def probe_inputs(audio_path, gif_path, render):
+    # ffmpeg_parse_infos only runs `ffmpeg -i` and reads the stream headers.
+    audio_infos = ffmpeg_parse_infos(audio_path)
+    gif_infos = ffmpeg_parse_infos(gif_path)
+    gif_width, gif_height = gif_infos["video_size"]
+    return dict(
+        render,
+        duration=audio_infos["duration"],
+        gif_width=gif_width,
+        gif_height=gif_height,
+    )
+
+def canvas_megapixels(probe):
+    return probe["width"] * probe["height"] / 1e6
+
+def render_work(probe):
+    # Every output frame composites the canvas and a GIF frame resized to the
+    # canvas height, so the work is counted in megapixels per output frame.
+    gif_height = probe["height"]
+    gif_width = gif_height * probe["gif_width"] / probe["gif_height"]
+    megapixels = canvas_megapixels(probe) + gif_width * gif_height / 1e6
+    return probe["duration"] * probe["fps"] * megapixels
+
+def estimate_job(probe, model):
+    coefficients = model[probe["preset"]]
+    seconds = (
+        RENDER_OVERHEAD_SECONDS
+        + coefficients["seconds_per_megapixel_frame"] * render_work(probe)
+    )
+    video_size = (
+        coefficients["bytes_per_megapixel_second"]
+        * canvas_megapixels(probe)
+        * probe["duration"]
+    )
+    return seconds, video_size + AUDIO_BYTES_PER_SECOND * probe["duration"]
+
+def calibrate_cost_model(model, probe, elapsed, output_size):
+    coefficients = model[probe["preset"]]
+    work = render_work(probe)
+    if work > 0:
+        observed = max(elapsed - RENDER_OVERHEAD_SECONDS, 0) / work
+        coefficients["seconds_per_megapixel_frame"] += CALIBRATION_WEIGHT * (
+            observed - coefficients["seconds_per_megapixel_frame"]
+        )
+    megapixel_seconds = canvas_megapixels(probe) * probe["duration"]
+    if megapixel_seconds > 0:
+        video_size = max(output_size - AUDIO_BYTES_PER_SECOND * probe["duration"], 0)
+        observed = video_size / megapixel_seconds
+        coefficients["bytes_per_megapixel_second"] += CALIBRATION_WEIGHT * (
+            observed - coefficients["bytes_per_megapixel_second"]
+        )
+    return model
+
+def format_duration(seconds):
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    if minutes:
+        return f"{minutes}m {seconds:02d}s"
+    return f"{seconds}s"
+
+
+class FrameProgressLogger(ProgressBarLogger):
+    def __init__(self, progress_queue):
+        super().__init__(min_time_interval=0.1)
+        self.progress_queue = progress_queue
+
+    def bars_callback(self, bar, attr, value, old_value=None):
+        # moviepy reports the video frames it has encoded on the "t" bar.
+        if bar == "t" and attr == "index" and value >= 0:
+            self.progress_queue.put(
+                ("frames", value, self.bars[bar]["total"], time.monotonic())
+            )
+
 
 def create_video(audio_path, gif_path, output_path, progress_queue, settings):
+    started = time.monotonic()
+    render = render_settings(settings)
+
+    # The planner only feeds the ETA, so none of its failures may fail the job.
+    try:
+        model = load_cost_model()
+    except (configparser.Error, ValueError):
+        model = copy.deepcopy(DEFAULT_COST_MODEL)
+    try:
+        probe = probe_inputs(audio_path, gif_path, render)
+        progress_queue.put(("estimate",) + estimate_job(probe, model))
+    except Exception:
+        probe = None
+
     try:
         audio_clip = AudioFileClip(audio_path)
-        progress_queue.put(10)
 
         gif_clip = VideoFileClip(gif_path)
         gif_width, gif_height = gif_clip.size
         aspect_ratio = gif_width / gif_height
-        new_height = settings["height"] if settings["custom_resolution"] else 720
+        new_height = render["height"]
         new_width = int(new_height * aspect_ratio)
         gif_clip = gif_clip.resize((new_width, new_height))
-        progress_queue.put(40)
 
-        video_width = settings["width"] if settings["custom_resolution"] else 1280
-        video_height = settings["height"] if settings["custom_resolution"] else 720
+        video_width = render["width"]
+        video_height = render["height"]
         position = ((video_width - new_width) // 2, (video_height - new_height) // 2)
         background_clip = ColorClip(size=(video_width, video_height), color=(0, 0, 0))
         background_clip = background_clip.set_duration(audio_clip.duration)
@@ -56,22 +199,32 @@ def create_video(audio_path, gif_path, output_path, progress_queue, settings):
             [background_clip, gif_clip.set_position(position)]
         )
         final_clip = final_clip.set_audio(audio_clip)
-        progress_queue.put(70)
 
         final_clip.write_videofile(
             output_path,
             codec="libx264",
             audio_codec="aac",
-            fps=24,
-            preset="ultrafast" if not settings["high_quality"] else "slow",
+            audio_bitrate=AUDIO_BITRATE,
+            fps=render["fps"],
+            preset=render["preset"],
+            logger=FrameProgressLogger(progress_queue),
         )
-        progress_queue.put(100)
-
-        messagebox.showinfo("Success", "Video created successfully!")
     except Exception as e:
         messagebox.showerror("Error", f"Failed to create video: {e}")
         progress_queue.put(-1)
+        return
 
+    if probe is not None:
+        try:
+            save_cost_model(
+                calibrate_cost_model(
+                    model, probe, time.monotonic() - started, os.path.getsize(output_path)
+                )
+            )
+        except (OSError, configparser.Error):
+            pass
+    progress_queue.put(100)
+    messagebox.showinfo("Success", "Video created successfully!")
 
 class YouTubeUploaderFrame(tk.Toplevel):
     def __init__(self, master=None, video_path=None):
@@ -463,26 +616,59 @@ class Application(tk.Frame):
 
     def convert_video(self, audio_path, gif_path, output_path):
         progress_queue = queue.Queue()
+        started = time.monotonic()
+        estimate = {"seconds": None, "size": None, "frame": None, "first_frame": None}
+
+        def show_eta():
+            now = time.monotonic()
+            remaining = None
+            # The model's prediction is only used until encoded frames arrive.
+            if estimate["seconds"] is not None:
+                remaining = estimate["seconds"] - (now - started)
+            if estimate["frame"] is not None:
+                frame, total, timestamp = estimate["frame"]
+                first_frame, first_time = estimate["first_frame"]
+                # Hold back the last percent until the worker reports completion.
+                self.progress_bar["value"] = min(99, frame / total * 100)
+                if frame > first_frame and timestamp > first_time:
+                    rate = (frame - first_frame) / (timestamp - first_time)
+                    remaining = (total - frame) / rate - (now - timestamp)
+            text = "Converting..."
+            if remaining is not None and remaining >= 1:
+                text += f" about {format_duration(remaining)} remaining"
+            if estimate["size"] is not None:
+                text += f" (~{estimate['size'] / 1e6:.1f} MB)"
+            self.status_label.config(text=text)
 
         def update_progress():
-            try:
-                progress = progress_queue.get(block=False)
-                if progress == -1:
+            while True:
+                try:
+                    progress = progress_queue.get(block=False)
+                except queue.Empty:
+                    break
+                if isinstance(progress, tuple):
+                    if progress[0] == "estimate":
+                        _, estimate["seconds"], estimate["size"] = progress
+                    elif progress[0] == "frames":
+                        _, frame, total, timestamp = progress
+                        if estimate["first_frame"] is None:
+                            estimate["first_frame"] = (frame, timestamp)
+                        estimate["frame"] = (frame, total, timestamp)
+                elif progress == -1:
                     self.status_label.config(text="Failed to create video.")
                     self.start_button.state(["!disabled"])
                     self.preview_button.state(["disabled"])
                     self.youtube_button.state(["disabled"])
+                    return
                 elif progress == 100:
                     self.progress_bar["value"] = progress
                     self.status_label.config(text="Conversion completed.")
                     self.start_button.state(["!disabled"])
                     self.preview_button.state(["!disabled"])
                     self.youtube_button.state(["!disabled"])
-                else:
-                    self.progress_bar["value"] = progress
-                    self.master.after(100, update_progress)
-            except queue.Empty:
-                self.master.after(100, update_progress)
+                    return
+            show_eta()
+            self.master.after(100, update_progress)
 
         threading.Thread(
             target=create_video,